@@ -1,12 +1,25 @@
+from __future__ import annotations
+
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
 import gspread
+from gspread.utils import absolute_range_name
 from google.oauth2.service_account import Credentials
 import pandas as pd
-import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from playwright.sync_api import sync_playwright, Playwright, TimeoutError as PlaywrightTimeoutError
+import numpy as np
+import os
+import random
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from importlib.machinery import ModuleSpec
+from keyword_scan import process_html_for_keywords
+from playwright.async_api import async_playwright, Browser, Page, Route, TimeoutError as PlaywrightTimeoutError
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -16,24 +29,41 @@ st.set_page_config(
 )
 
 # --- CONFIG & CONSTANTS ---
-# Refined keyword list to be more efficient and avoid redundancy.
-# The regex will handle variations.
-KEYWORDS = [
-    'bpo', 'business process outsourcing', 'customer', 'cx', 'support', 'csat',
-    'chief customer', 'head of customer', 'vp of customer', 'director of support',
-    'chief experience officer', 'c-x-o', # for CXO
-    'vp of support', 'vp of service', 'vp of experience', 'vp of care',
-    'head of support', 'head of service', 'head of experience', 'head of care',
-    'director of customer', 'director of support', 'director of service', 'director of experience',
-    'director of care', 'director of client services',
-    'procurement', 'cpo', 'chief procurement officer', 'sourcing',
-    'purchasing', 'vendor management', 'supplier management', 'partner management',
-    'cfo', 'chief financial officer', 'fp&a', 'financial planning',
-    'controller', 'subscribe', 'subscription', 'chat'
-]
-# Compile keywords into a single regex pattern for efficiency
-# \b ensures we match whole words only. re.IGNORECASE makes it case-insensitive.
-KEYWORD_PATTERN = re.compile(r'\b(' + '|'.join(re.escape(kw) for kw in KEYWORDS) + r')\b', re.IGNORECASE)
+# Fast mode reads at most this many bytes of each page
+MAX_BYTES = 500_000
+READ_CHUNK_SIZE = 65_536
+# Responses that are not HTML, or that announce a body larger than this, are skipped
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+MAX_CONTENT_LENGTH = 5_000_000
+FAST_TIMEOUT = aiohttp.ClientTimeout(total=15)
+FAST_HEADERS = {"User-Agent": "Mozilla/5.0"}
+DNS_CACHE_TTL = 300 # seconds
+KEEPALIVE_TIMEOUT = 30 # seconds an idle pooled connection stays open
+# Dropped connections and these statuses are retried with exponential backoff: ~0.5s, then ~1s.
+# A server's Retry-After is honoured instead when present, up to MAX_RETRY_AFTER seconds.
+FAST_RETRIES = 2
+FAST_BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 10
+# A HEAD request weeds out dead pages and resolves redirects before the GET.
+# Some servers reject HEAD outright (or block it) while serving GET fine, so those statuses fall through.
+HEAD_TIMEOUT = aiohttp.ClientTimeout(total=5)
+HEAD_FALLBACK_STATUSES = {403, 405, 501} | RETRY_STATUSES
+
+# Deep mode skips downloading these resource types; they never contribute page text
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+# Deep mode reuses its pages across sites; clear a page's cookies every this many sites so state doesn't pile up
+COOKIE_RESET_EVERY = 20
+
+# The progress bar is redrawn at most about this many times per run; each redraw is a websocket message
+PROGRESS_UPDATES = 100
+
+# Partial results are written to the sheet every FLUSH_EVERY rows or FLUSH_INTERVAL seconds
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 10
+
+# Scrape results are kept on disk between runs, keyed by normalized URL
+RESULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_cache.sqlite3")
 
 # --- CACHED RESOURCES ---
 
@@ -53,10 +83,71 @@ def authenticate_google_sheets():
         st.error(f"Google Sheets authentication failed: {e}. Ensure 'gcp_service_account' is in your Streamlit Secrets.")
         return None
 
-@st.cache_resource(ttl=3600)
-def get_requests_session():
-    """Returns a cached requests.Session object."""
-    return requests.Session()
+@st.cache_resource(ttl=600)
+def get_sheet(sheet_name: str, tab_index: int):
+    """Opens a worksheet once and reuses the handle, saving the Drive and Sheets lookups on every run."""
+    client = authenticate_google_sheets()
+    return client.open(sheet_name).get_worksheet(tab_index)
+
+# Spawned processes normally re-run the parent's main script first, and Streamlit runs this
+# file as a stand-in __main__ module, so every parse worker would load the whole app and
+# draw its widgets. A spec named "__main__" marks the script as main-only code, like a
+# package's __main__.py, which multiprocessing leaves alone in the workers.
+if __name__ == "__main__":
+    __spec__ = ModuleSpec("__main__", None)
+
+@st.cache_resource
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Starts the process pool that scraped pages are parsed in, once per server process."""
+    # Workers only import keyword_scan, to unpickle their first task, so the keyword automaton
+    # is built once per worker and none of the server's threads are forked into them
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+class ResultCache:
+    """SQLite cache of scrape results keyed by scrape mode and normalized URL, shared by every run and thread."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            # WAL lets readers proceed during writes; NORMAL sync is safe with WAL and much faster
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self.conn.commit()
+
+    def get_many(self, urls: list[str], max_age: float) -> dict[str, str]:
+        """Returns `{url: result}` for the URLs scraped within the last `max_age` seconds."""
+        found = {}
+        cutoff = time.time() - max_age
+        with self.lock:
+            # Chunked to stay under SQLite's limit on query parameters
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self.conn.execute(
+                    f"SELECT url, result FROM results WHERE url IN ({placeholders}) AND fetched_at > ?",
+                    (*chunk, cutoff),
+                ).fetchall())
+        return found
+
+    def put(self, url: str, result: str):
+        """Stores a result; errors are not cached so they are retried on the next run."""
+        if result.startswith("Error"):
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (url, fetched_at, result) VALUES (?, ?, ?)",
+                (url, time.time(), result),
+            )
+            self.conn.commit()
+
+@st.cache_resource
+def get_result_cache():
+    """Opens the on-disk result cache once per process."""
+    return ResultCache(RESULT_CACHE_PATH)
 
 # --- CORE FUNCTIONS ---
 
@@ -66,97 +157,353 @@ def clean_domain(domain: str) -> str | None:
     if not domain:
         return None
     # Avoid creating invalid URLs like https://https://example.com
-    if domain.startswith(('http://', 'https://')):
+    if domain.lower().startswith(('http://', 'https://')):
         return domain
     return f"https://{domain}"
 
-def process_html_for_keywords(html_content: str) -> str:
-    """Parses HTML, extracts text, and finds keywords using regex."""
-    soup = BeautifulSoup(html_content, "html.parser")
-    # Remove tags that typically contain no useful, unique content
-    for tag in soup(["script", "style", "noscript", "nav", "footer", "header"]):
-        tag.decompose()
+def normalize_url(domain: str) -> str | None:
+    """Returns a canonical URL for a domain so duplicate rows can be spotted.
 
-    text = soup.get_text(separator=" ", strip=True)
-    found_keywords = sorted(list(set(KEYWORD_PATTERN.findall(text.lower()))))
+    The host is lowercased and loses any "www." prefix, trailing slashes are dropped and
+    http is treated as https, so "Example.com", "http://www.example.com/" and
+    "example.com" all map to the same key. Input that can't be parsed as a URL is its own key.
+    """
+    url = clean_domain(domain)
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url)
+    except ValueError: # e.g. an unbalanced "[" in the host; keep the row and let its scrape fail
+        return domain.strip()
+    host = parts.netloc.lower().removeprefix("www.")
+    return urlunsplit(("https", host, parts.path.rstrip("/"), parts.query, ""))
 
-    if found_keywords:
-        return "YES: " + ", ".join(found_keywords)
-    return "NO"
+class SkippedPage(Exception):
+    """Raised when a response is not worth downloading, e.g. a PDF or a huge file."""
 
-def scrape_page_fast(domain: str, session: requests.Session) -> str:
-    """Scrapes a single website using the fast 'requests' method."""
+def check_html_headers(r: aiohttp.ClientResponse):
+    """Raises SkippedPage if the response headers announce a non-HTML or oversized body."""
+    if r.headers.get("Content-Type") and r.content_type not in HTML_CONTENT_TYPES:
+        raise SkippedPage("non-HTML")
+    if (r.content_length or 0) > MAX_CONTENT_LENGTH:
+        raise SkippedPage("too large")
+
+async def read_html(r: aiohttp.ClientResponse) -> tuple[bytes, str | None]:
+    """Reads up to MAX_BYTES of an HTML response body and returns it with its charset."""
+    r.raise_for_status()
+    # Headers arrive before the body, so junk responses are dropped without downloading them
+    check_html_headers(r)
+    # Stream the body so huge files are never fully downloaded.
+    # aiohttp hands back decompressed chunks, so the cap bounds the HTML actually parsed,
+    # not the gzip/brotli bytes on the wire.
+    # A bytearray appends in place instead of copying the whole buffer per chunk.
+    buffer = bytearray()
+    async for chunk in r.content.iter_chunked(READ_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) >= MAX_BYTES:
+            break
+    return bytes(buffer[:MAX_BYTES]), r.charset
+
+async def resolve_url(url: str, session: aiohttp.ClientSession) -> str:
+    """Follows redirects with a cheap HEAD request and returns the final URL.
+
+    Raises aiohttp.ClientResponseError for dead pages and SkippedPage for non-HTML or
+    oversized ones, so their body is never requested.
+    Servers that refuse HEAD, time out on it or drop the connection are left for the
+    GET to decide, which retries connection failures.
+    """
+    try:
+        async with session.head(url, allow_redirects=True, timeout=HEAD_TIMEOUT) as r:
+            if r.status < 400:
+                check_html_headers(r)
+                return str(r.url)
+            if r.status not in HEAD_FALLBACK_STATUSES:
+                r.raise_for_status()
+    except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+        pass
+    return url
+
+async def fetch_html(url: str, session: aiohttp.ClientSession) -> tuple[bytes, str | None]:
+    """Downloads a page, retrying dropped connections and transient server errors."""
+    # Servers that honour Range stop sending after the bytes we would read anyway
+    headers = {"Range": f"bytes=0-{MAX_BYTES - 1}"}
+    attempt = 0
+    while True:
+        # Exponential backoff plus jitter so flaky hosts are not all retried in lockstep
+        delay = FAST_BACKOFF * 2 ** attempt + random.uniform(0, FAST_BACKOFF)
+        try:
+            async with session.get(url, headers=headers) as r:
+                if r.status == 416 and headers:
+                    # Range not satisfiable (e.g. an empty body); ask again for the whole page
+                    headers = None
+                    continue
+                if r.status not in RETRY_STATUSES or attempt == FAST_RETRIES:
+                    return await read_html(r)
+                retry_after = r.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = min(int(retry_after), MAX_RETRY_AFTER)
+        except aiohttp.ClientConnectionError:
+            if attempt == FAST_RETRIES:
+                raise
+        attempt += 1
+        await asyncio.sleep(delay)
+
+def create_fast_session(concurrency: int) -> aiohttp.ClientSession:
+    """Creates the pooled session shared by every request in a Fast mode run."""
+    # The pool holds one connection per worker, so every in-flight request gets a socket.
+    # Keep-alive connections in the pool are reused across domains on the same host,
+    # and DNS answers are cached so repeated hosts skip the lookup
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, headers=FAST_HEADERS, timeout=FAST_TIMEOUT)
+
+async def parse_html(html_content: str | bytes, encoding: str | None = None) -> str:
+    """Finds the page's keywords in the shared process pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    try:
+        return await loop.run_in_executor(pool, process_html_for_keywords, html_content, encoding)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory) and the pool refuses all further work, so
+        # start a new one. Sites failing at the same time replace the broken pool only once
+        if get_parse_pool() is pool:
+            get_parse_pool.clear()
+            pool.shutdown(wait=False)
+        return await loop.run_in_executor(get_parse_pool(), process_html_for_keywords, html_content, encoding)
+
+async def scrape_page_fast(domain: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> str:
+    """Scrapes a single website using the fast 'aiohttp' method."""
     url = clean_domain(domain)
     if not url:
         return "Empty Domain"
     try:
-        # Use stream=True and iter_content to avoid downloading huge files
-        with session.get(
-            url,
-            timeout=10,
-            headers={"User-Agent": "Mozilla/5.0"},
-            stream=True
-        ) as r:
-            r.raise_for_status()
-            html = r.content[:500_000] # Read up to 500KB
-        return process_html_for_keywords(html)
-    except requests.exceptions.RequestException as e:
+        async with semaphore:
+            url = await resolve_url(url, session)
+            html, encoding = await fetch_html(url, session)
+        # Parsing is CPU-bound and holds the GIL, so it runs in other processes to use every core
+        return await parse_html(html, encoding)
+    except SkippedPage as e:
+        return f"Skipped: {e}"
+    except aiohttp.ClientResponseError as e:
+        return f"Error: HTTP {e.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         return f"Error: Connection failed ({type(e).__name__})"
     except Exception as e:
         return f"Error: {e}"
 
-def scrape_page_deep(domain: str, playwright: Playwright) -> str:
-    """Scrapes a single website using the deep 'Playwright' method to render JS."""
+async def scrape_all_fast(domains: list[str], concurrency: int, on_result=None) -> list[str]:
+    """Scrapes all domains concurrently on a single event loop.
+
+    `on_result(index, result)` is called as each domain finishes so the UI can report progress.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(domains)
+
+    async with create_fast_session(concurrency) as session:
+        async def run(index: int, domain: str) -> tuple[int, str]:
+            return index, await scrape_page_fast(domain, session, semaphore)
+
+        # Results are handled in completion order by this one driver loop, so progress
+        # reporting stays out of the scraping tasks. on_result runs on the event loop, so it
+        # must not block: a slow call stalls every request in flight
+        for next_done in asyncio.as_completed([run(i, domain) for i, domain in enumerate(domains)]):
+            index, result = await next_done
+            results[index] = result
+            if on_result:
+                on_result(index, result)
+    return results
+
+async def block_heavy_resources(route: Route):
+    """Playwright route handler that aborts requests for resources with no text in them."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def open_deep_page(browser: Browser) -> Page:
+    """Opens a page in a new browser context set up for keyword scraping."""
+    context = await browser.new_context(
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        java_script_enabled=True,
+        ignore_https_errors=True
+    )
+    # Only the HTML text matters, so don't download images, fonts, media or CSS
+    await context.route("**/*", block_heavy_resources)
+    return await context.new_page()
+
+async def scrape_page_deep(domain: str, browser: Browser, pages: asyncio.Queue) -> str:
+    """Scrapes a single website using the deep 'Playwright' method to render JS.
+
+    Borrows a `(page, uses)` pair from `pages` and puts it back when done, so sites
+    are visited one after another in the same pages instead of new contexts. A page
+    that failed is put back as None and replaced by the next site that borrows it.
+    """
     url = clean_domain(domain)
     if not url:
         return "Empty Domain"
 
-    browser = None # Initialize browser to None
+    page, uses = await pages.get()
     try:
-        # Launch the browser with arguments for cloud environments
-        browser = playwright.chromium.launch(
-            args=["--no-sandbox", "--disable-setuid-sandbox"]
-        )
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            java_script_enabled=True,
-            ignore_https_errors=True
-        )
-        page = context.new_page()
+        if page is None:
+            page, uses = await open_deep_page(browser), 0
+        elif uses and uses % COOKIE_RESET_EVERY == 0:
+            await page.context.clear_cookies()
+        uses += 1
         # Increased timeout to 60 seconds for slower sites
-        page.goto(url, timeout=60000, wait_until='domcontentloaded')
-        # Give the page a moment for any lazy-loaded content
-        page.wait_for_timeout(2500)
-        html = page.content()
-        return process_html_for_keywords(html)
+        await page.goto(url, timeout=60000, wait_until='domcontentloaded')
+        # Give lazy-loaded content a chance to arrive, but don't let chatty trackers stall the page
+        try:
+            await page.wait_for_load_state('networkidle', timeout=5000)
+        except PlaywrightTimeoutError:
+            pass
+        html = await page.content()
     except PlaywrightTimeoutError:
         return "Error: Page load timed out"
     except Exception as e:
+        # A crashed renderer doesn't mark the page closed, so any other failure retires it
+        # rather than handing a broken page to the next site
+        if page is not None:
+            try:
+                await page.context.close()
+            except Exception:
+                pass
+        page = None
         # Provide a more specific error message
         return f"Error: Playwright failed ({type(e).__name__})"
     finally:
-        # Ensure the browser is always closed to free up resources
-        if browser:
-            browser.close()
-
-def update_sheet(sheet, results_df: pd.DataFrame):
-    """Updates a specific column in the Google Sheet with results."""
-    if results_df.empty:
-        return
+        pages.put_nowait((page, uses))
+
+    try:
+        return await parse_html(html)
+    except Exception as e:
+        # Only this site's row fails; the page itself is fine and already back in the pool
+        return f"Error: {e}"
+
+async def scrape_all_deep(domains: list[str], concurrency: int, on_result=None) -> list[str]:
+    """Scrapes all domains with one browser driving `concurrency` pages on a single event loop.
+
+    `on_result(index, result)` is called as each domain finishes so the UI can report progress.
+    """
+    if not domains:
+        return []
+    results = [None] * len(domains)
+
+    def record(index: int, result: str):
+        results[index] = result
+        if on_result:
+            on_result(index, result)
+
+    try:
+        async with async_playwright() as p:
+            # Launch the browser with arguments for cloud environments
+            browser = await p.chromium.launch(args=["--no-sandbox", "--disable-setuid-sandbox"])
+            try:
+                # The free pages double as the concurrency limit: a site waits until one is returned
+                pages = asyncio.Queue()
+                for _ in range(min(concurrency, len(domains))):
+                    pages.put_nowait((await open_deep_page(browser), 0))
+
+                async def run(index: int, domain: str) -> tuple[int, str]:
+                    return index, await scrape_page_deep(domain, browser, pages)
+
+                for next_done in asyncio.as_completed([run(i, domain) for i, domain in enumerate(domains)]):
+                    record(*await next_done)
+            finally:
+                await browser.close()
+    except Exception as e:
+        # Without a browser nothing can be scraped; fail the remaining domains so the run still finishes
+        for index, result in enumerate(results):
+            if result is None:
+                record(index, f"Error: Playwright failed ({type(e).__name__})")
+    return results
+
+def update_sheet(sheet, updates: list[tuple[int, str]]) -> bool:
+    """Writes `(row_number, result)` pairs to column B in a single API call. Returns True on success."""
+    if not updates:
+        return True
+    # Group consecutive rows into blocks so each block is one range in the batch
+    blocks = []
+    for row_number, result in sorted(updates):
+        if blocks and row_number == blocks[-1][0] + len(blocks[-1][1]):
+            blocks[-1][1].append([result])
+        else:
+            blocks.append((row_number, [[result]]))
+    data = [
+        {"range": absolute_range_name(sheet.title, f"B{start}:B{start + len(values) - 1}"), "values": values}
+        for start, values in blocks
+    ]
     try:
-        # Prepare the data for batch update (list of lists)
-        update_data = results_df[['Result']].values.tolist()
-        sheet.update(f'B2:B{len(update_data) + 1}', update_data, value_input_option='RAW')
+        sheet.spreadsheet.values_batch_update({"valueInputOption": "RAW", "data": data})
+        return True
     except Exception as e:
         st.error(f"Failed to update sheet: {e}")
+        return False
 
-def load_domains(sheet) -> list[str]:
-    """Loads a list of domains from the first column of the sheet."""
+class IncrementalSheetWriter:
+    """Writes finished results to the sheet in batches while a scrape is still running.
+
+    Rows are buffered and sent together, so a crash mid-run keeps most of the work
+    without spending one API call per row. `record` is called from the scrape's event
+    loop, so batches are sent by a background thread and never hold up the scraping.
+    """
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.pending = [] # (row_number, result) pairs not yet in the sheet
+        self.last_write = time.monotonic()
+        self.lock = threading.Lock()
+        # One thread sends the batches in order, one at a time
+        self.writer = ThreadPoolExecutor(max_workers=1)
+
+    def record(self, row_number: int, result: str):
+        """Queues one finished row and sends a batch if the batch size or interval is reached."""
+        with self.lock:
+            self.pending.append((row_number, result))
+            if len(self.pending) < FLUSH_EVERY and time.monotonic() - self.last_write < FLUSH_INTERVAL:
+                return
+            batch, self.pending = self.pending, []
+            self.last_write = time.monotonic()
+        self.writer.submit(self.write, batch)
+
+    def write(self, batch: list[tuple[int, str]]):
+        """Writes one batch; on failure its rows are queued again for the next attempt.
+
+        Errors from the background thread can't be shown in the app, but the rows are
+        retried by the final flush, which reports any failure that remains.
+        """
+        if not update_sheet(self.sheet, batch):
+            with self.lock:
+                self.pending[:0] = batch
+
+    def flush(self):
+        """Ends the run's writes: waits for batches still being sent, then writes what is left from the calling thread."""
+        self.writer.shutdown(wait=True)
+        with self.lock:
+            batch, self.pending = self.pending, []
+        self.write(batch)
+
+def has_final_result(result: str) -> bool:
+    """True if a Column B value is a finished YES/NO answer rather than empty or an error."""
+    return result == "NO" or result.startswith("YES")
+
+def load_domains(sheet) -> list[tuple[int, str, str]]:
+    """Loads `(row_number, domain, existing_result)` for each non-empty domain in the sheet.
+
+    Columns A and B are read together in a single API call.
+    """
     try:
-        # Get all values from the first column, excluding the header
-        all_domains = sheet.col_values(1)[1:]
-        # Filter out any empty cells
-        return [d.strip() for d in all_domains if d.strip()]
+        # Skip the header row; trailing empty cells are left out of the response
+        response = sheet.spreadsheet.values_batch_get([absolute_range_name(sheet.title, "A2:B")])
+        values = response["valueRanges"][0].get("values", [])
+        rows = []
+        for row_number, row in enumerate(values, start=2):
+            domain = row[0].strip() if row else ""
+            if domain:
+                rows.append((row_number, domain, row[1] if len(row) > 1 else ""))
+        return rows
     except Exception as e:
         st.error(f"Failed to load domains from sheet: {e}")
         return []
@@ -182,69 +529,128 @@ with st.expander("⚙️ **Configuration**", expanded=True):
         value=5,
         help="Number of websites to scrape simultaneously. Start with a low number (like 3-5) to avoid memory errors."
     )
+    rescrape_all = st.checkbox(
+        "5. Re-scrape domains that already have a result",
+        value=False,
+        help="By default, rows whose Column B already says YES or NO are skipped. Rows that are empty or show an error are always scraped. Ticking this also ignores the result cache from option 6."
+    )
+    cache_ttl_hours = st.slider(
+        "6. Reuse results scraped within the last N hours",
+        min_value=0,
+        max_value=168,
+        value=24,
+        help="Sites scraped recently in the same mode are answered from a local cache instead of being fetched again. Set to 0 to always scrape."
+    )
+    verbose_progress = st.checkbox(
+        "7. Show each scraped domain in the progress bar",
+        value=False,
+        help="Names the most recently finished domain alongside the count."
+    )
+    if st.button("🔄 Reconnect to Sheet", help="The sheet connection is reused for 10 minutes. Click this if the sheet was renamed, shared or changed since."):
+        get_sheet.clear()
 
 if st.button("🚀 Start Scraping", type="primary", use_container_width=True, disabled=(not sheet_name)):
     client = authenticate_google_sheets()
     if client:
         try:
-            sheet = client.open(sheet_name).get_worksheet(sheet_tab_index)
+            sheet = get_sheet(sheet_name, sheet_tab_index)
             st.info(f"✅ Successfully connected to '{sheet_name}'.")
 
-            domains = load_domains(sheet)
-            if not domains:
+            all_rows = load_domains(sheet)
+            # Rows with a finished answer from an earlier run don't need to be fetched again
+            sheet_rows = all_rows if rescrape_all else [row for row in all_rows if not has_final_result(row[2])]
+            domains = [domain for _, domain, _ in sheet_rows]
+            if not all_rows:
                 st.warning("⚠️ No domains found in Column A of your sheet.")
+            elif not domains:
+                st.success(f"✅ All {len(all_rows)} domains already have a result. Tick option 5 to scrape them again.")
             else:
-                st.info(f"Found {len(domains)} domains. Starting {scrape_mode.lower()} scrape with {concurrency} workers...")
+                already_done = len(all_rows) - len(domains)
+                skipped_note = f" ({already_done} already done, skipped)" if already_done else ""
+                st.info(f"Found {len(domains)} domains to scrape{skipped_note}. Starting {scrape_mode.lower()} scrape with {concurrency} workers...")
 
-                results = {}
+                # Results are stored by row position, so the original order is kept without a lookup
+                results = [None] * len(domains)
                 progress_bar = st.progress(0, text="Initializing...")
+                sheet_writer = IncrementalSheetWriter(sheet)
+
+                # Rows that point at the same site are scraped once and share the result
+                rows_by_url = {}
+                for i, domain in enumerate(domains):
+                    rows_by_url.setdefault(normalize_url(domain) or domain, []).append(i)
+                unique_urls = list(rows_by_url)
+                unique_rows = list(rows_by_url.values())
+                unique_domains = [domains[rows[0]] for rows in unique_rows]
+                duplicate_count = len(domains) - len(unique_domains)
+                if duplicate_count:
+                    rows_point = "row points" if duplicate_count == 1 else "rows point"
+                    st.info(f"{duplicate_count} {rows_point} at a site listed on another row; each site is scraped once and the result is shared.")
+
+                completed = []
+                update_every = max(1, len(domains) // PROGRESS_UPDATES)
+
+                def record_result(index: int, result: str):
+                    """Stores a finished site's result on all of its rows and advances the progress bar."""
+                    done_before = len(completed)
+                    for row in unique_rows[index]:
+                        results[row] = result
+                        completed.append(row)
+                        sheet_writer.record(sheet_rows[row][0], result)
+                    # Only redraw when another 1/PROGRESS_UPDATES of the run has finished, and at the end
+                    if len(completed) // update_every == done_before // update_every and len(completed) < len(domains):
+                        return
+                    text = f"({len(completed)}/{len(domains)})"
+                    if verbose_progress:
+                        text += f" Scraped: {unique_domains[index]}"
+                    progress_bar.progress(len(completed) / len(domains), text=text)
+
+                # Sites scraped within the cache TTL are answered without touching the network.
+                # Fast mode can miss keywords that Deep mode finds, so each mode has its own entries,
+                # and a forced re-scrape ignores the cache (it still refreshes it)
+                result_cache = get_result_cache()
+                cache_keys = [f"{scrape_mode}:{url}" for url in unique_urls]
+                use_cache = cache_ttl_hours and not rescrape_all
+                cached = result_cache.get_many(cache_keys, max_age=cache_ttl_hours * 3600) if use_cache else {}
+                for index, key in enumerate(cache_keys):
+                    if key in cached:
+                        record_result(index, cached[key])
+                to_scrape = [index for index, key in enumerate(cache_keys) if key not in cached]
+
+                def record_scraped(position: int, result: str):
+                    """Caches a freshly scraped result and records it."""
+                    index = to_scrape[position]
+                    result_cache.put(cache_keys[index], result)
+                    record_result(index, result)
 
-                with ThreadPoolExecutor(max_workers=concurrency) as executor:
-                    future_to_domain = {}
-                    if scrape_mode == 'Deep':
-                        # Using 'with' ensures Playwright is properly shut down
-                        with sync_playwright() as p:
-                            for domain in domains:
-                                future = executor.submit(scrape_page_deep, domain, p)
-                                future_to_domain[future] = domain
-                    else: # Fast mode
-                        session = get_requests_session()
-                        for domain in domains:
-                            future = executor.submit(scrape_page_fast, domain, session)
-                            future_to_domain[future] = domain
-
-                    completed_count = 0
-                    for future in as_completed(future_to_domain):
-                        domain = future_to_domain[future]
-                        try:
-                            results[domain] = future.result()
-                        except Exception as e:
-                            results[domain] = f"Error: Future failed ({e})"
-                        completed_count += 1
-                        percent_complete = completed_count / len(domains)
-                        progress_bar.progress(percent_complete, text=f"({completed_count}/{len(domains)}) Scraped: {domain}")
+                scrape_domains = [unique_domains[index] for index in to_scrape]
+                if scrape_mode == 'Deep':
+                    asyncio.run(scrape_all_deep(scrape_domains, concurrency, on_result=record_scraped))
+                else: # Fast mode
+                    # One event loop overlaps all network waits instead of parking a thread per site
+                    asyncio.run(scrape_all_fast(scrape_domains, concurrency, on_result=record_scraped))
 
                 progress_bar.progress(1.0, text="Scraping complete! Updating Google Sheet...")
 
-                # Reorder results to match the original domain list
-                ordered_results = [results.get(domain, "Error: Not processed") for domain in domains]
-                results_df = pd.DataFrame({'Domain': domains, 'Result': ordered_results})
+                for i, result in enumerate(results):
+                    if result is None:
+                        results[i] = "Error: Not processed"
+                        sheet_writer.record(sheet_rows[i][0], results[i])
+                results_df = pd.DataFrame({'Domain': domains, 'Result': results})
 
-                update_sheet(sheet, results_df)
+                # Only the rows not already written during the run are sent
+                sheet_writer.flush()
                 st.success("✅ Done! The Google Sheet has been updated.")
                 st.balloons()
 
                 st.subheader("📊 Scraping Results")
-                def style_results(val):
-                    color = 'white' # Default color for "NO"
-                    if isinstance(val, str):
-                        if "YES" in val:
-                            color = '#28a745' # Green
-                        elif "Error" in val:
-                            color = '#dc3545' # Red
-                    return f'color: {color};'
-
-                st.dataframe(results_df.style.applymap(style_results, subset=['Result']), use_container_width=True)
+                # Colors are computed for the whole column in one vectorized pass, not per cell
+                result_col = results_df['Result']
+                colors = np.where(
+                    result_col.str.startswith('YES'), 'color: #28a745;', # Green
+                    np.where(result_col.str.startswith('Error'), 'color: #dc3545;', 'color: white;') # Red, default for "NO"
+                )
+                styled_df = results_df.style.apply(lambda col: colors, subset=['Result'], axis=0)
+                st.dataframe(styled_df, use_container_width=True)
 
         except gspread.exceptions.SpreadsheetNotFound:
             st.error(f"❌ Spreadsheet '{sheet_name}' not found. Check the name and that your service account has access.")
@@ -0,0 +1,120 @@
+"""Page text extraction and keyword matching.
+
+Kept free of Streamlit so Fast mode's parsing processes can import it without running the app.
+"""
+from __future__ import annotations
+
+import re
+import ahocorasick
+from html import unescape
+from selectolax.lexbor import LexborHTMLParser
+
+# Refined keyword list to be more efficient and avoid redundancy.
+KEYWORDS = [
+    'bpo', 'business process outsourcing', 'customer', 'cx', 'support', 'csat',
+    'chief customer', 'head of customer', 'vp of customer',
+    'chief experience officer', 'c-x-o', # for CXO
+    'vp of support', 'vp of service', 'vp of experience', 'vp of care',
+    'head of support', 'head of service', 'head of experience', 'head of care',
+    'director of customer', 'director of support', 'director of service', 'director of experience',
+    'director of care', 'director of client services',
+    'procurement', 'cpo', 'chief procurement officer', 'sourcing',
+    'purchasing', 'vendor management', 'supplier management', 'partner management',
+    'cfo', 'chief financial officer', 'fp&a', 'financial planning',
+    'controller', 'subscribe', 'subscription', 'chat'
+]
+# Lowercased, de-duplicated keywords, computed once at load (matching runs on lowercased text)
+KEYWORDS_LC = tuple(dict.fromkeys(kw.lower() for kw in KEYWORDS))
+
+# Build an Aho-Corasick automaton once so each page is scanned for all keywords in a single pass.
+# This module is imported once per process and not re-executed on Streamlit reruns, so the
+# automaton and the patterns below are only ever built once
+KEYWORD_AUTOMATON = ahocorasick.Automaton()
+for kw in KEYWORDS_LC:
+    KEYWORD_AUTOMATON.add_word(kw, kw)
+KEYWORD_AUTOMATON.make_automaton()
+
+# Tags that typically contain no useful, unique content
+NOISE_TAGS = ["script", "style", "noscript", "nav", "footer", "header"]
+NOISE_SELECTOR = ",".join(NOISE_TAGS)
+
+# Byte-level patterns for stripping markup without building a DOM at all.
+# Comments and noise blocks go first so their contents never reach the text.
+# Pages are cut off at MAX_BYTES, so a block left open at the end of the buffer runs to the end.
+NOISE_BLOCK_RE = re.compile(
+    rb'<!--.*?(?:-->|\Z)|<(' + b'|'.join(t.encode() for t in NOISE_TAGS) + rb')(?=[\s/>])[^>]*>.*?(?:</\1\s*>|\Z)',
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_RE = re.compile(rb'<[^>]+>')
+
+def decode_html(html_content: bytes, encoding: str | None = None) -> str:
+    """Decodes page bytes with the charset from the headers, falling back to UTF-8."""
+    try:
+        return html_content.decode(encoding or "utf-8", errors="ignore")
+    except LookupError: # Unknown charset in the response headers
+        return html_content.decode("utf-8", errors="ignore")
+
+def extract_text_fast(html_content: bytes, encoding: str | None = None) -> str:
+    """Extracts lowercased visible text by stripping noise blocks and tags from the raw bytes with regex."""
+    stripped = TAG_RE.sub(b" ", NOISE_BLOCK_RE.sub(b" ", html_content))
+    # Entities such as "fp&amp;a" must be decoded to match keywords
+    if b"&#" in stripped:
+        # Numeric references can decode to capitals ("&#67;FO"), so lowercase after unescaping
+        return unescape(decode_html(stripped, encoding)).lower()
+    # Keywords are ASCII, so lowercasing only A-Z at the byte level is enough and
+    # avoids walking the decoded text through Unicode case tables
+    return unescape(decode_html(stripped.lower(), encoding))
+
+def extract_text_dom(html_content: bytes, encoding: str | None = None) -> str:
+    """Extracts visible text with a full parse by selectolax's Lexbor C parser."""
+    tree = LexborHTMLParser(decode_html(html_content, encoding))
+    for node in tree.css(NOISE_SELECTOR):
+        node.decompose()
+    # Only the title and body carry visible text; the rest of <head> is metadata
+    return " ".join(node.text(separator=" ") for node in (tree.css_first("title"), tree.body) if node)
+
+def is_word_char(char: str) -> bool:
+    """Mirrors regex \\w: letters, digits and underscore."""
+    return char.isalnum() or char == "_"
+
+def find_keywords(text: str) -> set[str]:
+    """Finds whole-word keyword matches in lowercased text.
+
+    Keeps the semantics of a `\\b(kw1|kw2|...)\\b` regex: matches must sit on word
+    boundaries and are taken leftmost-first without overlapping, so "chief customer"
+    reports only "chief customer", not "customer" as well.
+    """
+    matches = []
+    for end, kw in KEYWORD_AUTOMATON.iter(text):
+        start = end - len(kw) + 1
+        if start > 0 and is_word_char(text[start - 1]):
+            continue
+        if end + 1 < len(text) and is_word_char(text[end + 1]):
+            continue
+        matches.append((start, -len(kw), kw))
+
+    found = set()
+    last_end = -1
+    # Longest match first at each start position, then skip anything it overlaps
+    for start, neg_length, kw in sorted(matches):
+        if start > last_end:
+            found.add(kw)
+            last_end = start - neg_length - 1
+    return found
+
+def process_html_for_keywords(html_content: str | bytes, encoding: str | None = None) -> str:
+    """Extracts the page text and finds keywords with the Aho-Corasick automaton."""
+    if isinstance(html_content, str):
+        # Rendered pages can hold lone surrogates, which UTF-8 can't encode; drop them like decode_html does
+        html_content = html_content.encode("utf-8", errors="ignore")
+        encoding = "utf-8"
+
+    text = extract_text_fast(html_content, encoding)
+    if not text.strip():
+        # Badly malformed markup can defeat the regex stripping; let a real parser try
+        text = extract_text_dom(html_content, encoding).lower()
+    found_keywords = sorted(find_keywords(text))
+
+    if found_keywords:
+        return "YES: " + ", ".join(found_keywords)
+    return "NO"